@@ -3,11 +3,15 @@ Flask server implementation for the Everything API.
 """
 import os
 import logging
+import functools
 from flask import Flask, jsonify, request, Response
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Callable, Dict, Any, Optional, Tuple, Union
 
-from classes.core.search import SearchService
+from classes.core.search import SearchService, SORT_OPTIONS, GROUP_BY_OPTIONS, HISTOGRAM_INTERVALS
+from classes.core.federation import FederatedSearchService
+from classes.core.models import SearchParams
 from classes.utils.config import Config
+from classes.utils.profiling import RequestProfiler
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +30,154 @@ class EverythingAPIServer:
         """
         self.config = config
         self.search_service = search_service
+        self.federated_search_service = self._create_federated_search_service()
+        self.profiler = RequestProfiler(
+            enabled=self.config.get_bool('Profiling', 'enabled', fallback=False),
+            admin_token=self.config.get('Profiling', 'admin_token', fallback='') or '',
+            sample_every=self.config.get_int('Profiling', 'sample_every', fallback=0),
+            max_reports=self.config.get_int('Profiling', 'max_reports', fallback=20),
+            top_functions=self.config.get_int('Profiling', 'top_functions', fallback=30)
+        )
         self.app = Flask(__name__)
         
         # Register routes
         self._register_routes()
     
+    def _create_federated_search_service(self) -> Optional[FederatedSearchService]:
+        """
+        Create the federated search service if peers are configured.
+
+        Returns:
+            A FederatedSearchService, or None if no peers are configured
+        """
+        peers_value = self.config.get('Federation', 'peers', fallback='') or ''
+        peers = [peer.strip() for peer in peers_value.split(',') if peer.strip()]
+        if not peers:
+            return None
+
+        include_local = self.config.get_bool('Federation', 'include_local', fallback=True)
+        return FederatedSearchService(
+            peers,
+            timeout=self.config.get_float('Federation', 'timeout', fallback=5.0),
+            search_service=self.search_service if include_local else None,
+            local_name=self.config.get('Federation', 'local_name', fallback='local')
+        )
+    
+    def _profile_requested(self) -> bool:
+        """
+        Check whether the current request asks to be profiled.
+
+        Returns:
+            True if the profile parameter is set to a true value
+        """
+        return request.args.get('profile', 'false').lower() in ('true', '1', 'yes')
+
+    def _profiling_authorized(self) -> bool:
+        """
+        Check whether the current request carries a valid admin token.
+
+        Returns:
+            True if profiling is enabled and the X-Admin-Token header matches
+        """
+        return self.profiler.is_authorized(request.headers.get('X-Admin-Token'))
+
+    def _forbidden(self) -> Tuple[Response, int]:
+        """
+        Build the response for unauthorized profiling requests.
+
+        Returns:
+            JSON response with error message and status code 403
+        """
+        return jsonify({"error": "Profiling is disabled or the admin token is invalid"}), 403
+
+    def _admin_only(self, view: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Decorate a route so it requires a valid admin token.
+
+        Args:
+            view: The route function
+
+        Returns:
+            The route function wrapped with the admin token check
+        """
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not self._profiling_authorized():
+                return self._forbidden()
+            return view(*args, **kwargs)
+        return wrapper
+
+    def _run_service(self, func: Callable[..., Any], *args: Any) -> Union[Response, Tuple[Response, int]]:
+        """
+        Call a service method, profiling it if requested or sampled, and build the JSON response.
+
+        Args:
+            func: The service method to call
+            *args: Arguments for the service method
+
+        Returns:
+            JSON response with the service result, and an X-Profile-Id header if profiled,
+            or a 403 response if profiling was requested without authorization
+        """
+        requested = self._profile_requested()
+        if requested and not self._profiling_authorized():
+            return self._forbidden()
+
+        # Building the dictionary is part of the request's work, so it is profiled too
+        result, report = self.profiler.run(request.full_path, requested, lambda: func(*args).to_dict())
+        response = jsonify(result)
+        if report is not None:
+            response.headers['X-Profile-Id'] = str(report.report_id)
+        return response
+    
+    def _parse_search_params(self, paged: bool = True) -> Tuple[Optional[SearchParams], Optional[Tuple[Response, int]]]:
+        """
+        Parse and validate the search parameters of the current request.
+
+        Args:
+            paged: Whether the limit and sort parameters are parsed as well
+
+        Returns:
+            The parsed SearchParams and None, or None and an error response
+        """
+        # Get query parameter
+        query = request.args.get('q')
+        if not query:
+            return None, (jsonify({"error": "Missing query parameter 'q'"}), 400)
+        
+        # Validate total search terms length
+        search_terms = [term.strip() for term in query.split() if term.strip()]
+        total_chars = sum(len(term) for term in search_terms)
+        
+        if total_chars < 3:
+            return None, (jsonify({
+                "error": f"Total length of search terms must be at least 3 characters. Current length: {total_chars}"
+            }), 400)
+        
+        # Get match_all parameter (default is true)
+        match_all_param = request.args.get('match_all', 'true').lower()
+        match_all = match_all_param not in ('false', '0', 'no')
+        
+        if not paged:
+            return SearchParams(query, match_all), None
+        
+        # Get limit parameter
+        try:
+            limit = int(request.args.get('limit', self.config.get_int('Search', 'max_results')))
+            if limit <= 0:
+                return None, (jsonify({"error": "Limit must be a positive integer"}), 400)
+        except ValueError:
+            return None, (jsonify({"error": "Invalid limit parameter"}), 400)
+        
+        # Get sort parameter (default is name)
+        sort = request.args.get('sort', 'name').lower()
+        if sort not in SORT_OPTIONS:
+            return None, (jsonify({
+                "error": f"Invalid sort parameter. Allowed values: {', '.join(SORT_OPTIONS)}"
+            }), 400)
+        
+        return SearchParams(query, match_all, limit, sort), None
+    
     def _register_routes(self) -> None:
         """
         Register API routes.
@@ -43,42 +190,106 @@ class EverythingAPIServer:
             Returns:
                 JSON response with search results
             """
-            # Get query parameter
-            query = request.args.get('q')
-            if not query:
-                return jsonify({"error": "Missing query parameter 'q'"}), 400
+            params, error = self._parse_search_params()
+            if error is not None:
+                return error
             
-            # Validate total search terms length
-            search_terms = [term.strip() for term in query.split() if term.strip()]
-            total_chars = sum(len(term) for term in search_terms)
-            
-            if total_chars < 3:
+            try:
+                # Perform search and return results
+                return self._run_service(
+                    self.search_service.search, params.query, params.limit, params.match_all, params.sort
+                )
+            except Exception as e:
+                logger.error(f"Search failed: {e}")
+                return jsonify({"error": str(e)}), 500
+
+        if self.federated_search_service is not None:
+            @self.app.route('/everything-search-api/federated-search', methods=['GET'])
+            def federated_search() -> Union[Response, Tuple[Dict[str, Any], int]]:
+                """
+                Handle federated search requests across all configured peers.
+
+                Returns:
+                    JSON response with merged search results and peer statuses
+                """
+                params, error = self._parse_search_params()
+                if error is not None:
+                    return error
+
+                try:
+                    # Perform federated search and return merged results
+                    return self._run_service(
+                        self.federated_search_service.search, params.query, params.limit, params.match_all, params.sort
+                    )
+                except Exception as e:
+                    logger.error(f"Federated search failed: {e}")
+                    return jsonify({"error": str(e)}), 500
+
+        @self.app.route('/everything-search-api/aggregate', methods=['GET'])
+        def aggregate() -> Union[Response, Tuple[Dict[str, Any], int]]:
+            """
+            Handle aggregate requests.
+
+            Returns:
+                JSON response with counts, size statistics, groups and histogram
+            """
+            params, error = self._parse_search_params(paged=False)
+            if error is not None:
+                return error
+
+            # Get group_by parameter
+            group_by = request.args.get('group_by') or None
+            if group_by is not None and group_by not in GROUP_BY_OPTIONS:
                 return jsonify({
-                    "error": f"Total length of search terms must be at least 3 characters. Current length: {total_chars}"
+                    "error": f"Invalid group_by parameter. Allowed values: {', '.join(GROUP_BY_OPTIONS)}"
                 }), 400
-            
-            # Get limit parameter
-            try:
-                limit = int(request.args.get('limit', self.config.get_int('Search', 'max_results')))
-                if limit <= 0:
-                    return jsonify({"error": "Limit must be a positive integer"}), 400
-            except ValueError:
-                return jsonify({"error": "Invalid limit parameter"}), 400
-            
-            # Get match_all parameter (default is true)
-            match_all_param = request.args.get('match_all', 'true').lower()
-            match_all = match_all_param not in ('false', '0', 'no')
-            
+
+            # Get histogram parameter
+            histogram = request.args.get('histogram') or None
+            if histogram is not None and histogram not in HISTOGRAM_INTERVALS:
+                return jsonify({
+                    "error": f"Invalid histogram parameter. Allowed values: {', '.join(HISTOGRAM_INTERVALS)}"
+                }), 400
+
             try:
-                # Perform search
-                response = self.search_service.search(query, limit, match_all)
-                
-                # Return results
-                return jsonify(response.to_dict())
+                # Perform aggregation and return aggregated values
+                return self._run_service(
+                    self.search_service.aggregate, params.query, params.match_all, group_by, histogram
+                )
             except Exception as e:
-                logger.error(f"Search failed: {e}")
+                logger.error(f"Aggregate failed: {e}")
                 return jsonify({"error": str(e)}), 500
-        
+
+        @self.app.route('/everything-search-api/admin/profiles', methods=['GET'])
+        @self._admin_only
+        def list_profiles() -> Union[Response, Tuple[Dict[str, Any], int]]:
+            """
+            List the stored profiling reports, newest first.
+
+            Returns:
+                JSON response with report summaries
+            """
+            reports = self.profiler.get_reports()
+            return jsonify({
+                "reports": [report.to_summary_dict() for report in reports],
+                "count": len(reports)
+            })
+
+        @self.app.route('/everything-search-api/admin/profiles/<int:report_id>', methods=['GET'])
+        @self._admin_only
+        def get_profile(report_id: int) -> Union[Response, Tuple[Dict[str, Any], int]]:
+            """
+            Get a stored profiling report.
+
+            Returns:
+                JSON response with the full report
+            """
+            report = self.profiler.get_report(report_id)
+            if report is None:
+                return jsonify({"error": f"Profile report {report_id} not found"}), 404
+
+            return jsonify(report.to_dict())
+
         @self.app.errorhandler(404)
         def not_found(e) -> Tuple[Dict[str, Any], int]:
             """
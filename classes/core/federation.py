@@ -0,0 +1,369 @@
+"""
+Federated search across several Everything API instances.
+"""
+import json
+import time
+import ntpath
+import heapq
+import queue
+import logging
+import http.client
+from datetime import datetime
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from classes.core.search import SearchService, SORT_OPTIONS
+from classes.core.models import SearchResult, SearchResponse, FederatedSearchResponse, PeerStatus
+
+logger = logging.getLogger(__name__)
+
+# Search endpoint of a peer, relative to its base URL
+PEER_SEARCH_PATH = "/everything-search-api/search"
+
+# Errors raised when a pooled keep-alive connection was closed by the peer,
+# ConnectionError includes the reset, aborted (WinError 10053) and broken pipe variants
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionError)
+
+
+class PeerClient:
+    """
+    HTTP client for a single peer instance with a pool of keep-alive connections.
+    """
+    def __init__(self, url: str, timeout: float, max_connections: int = 4):
+        """
+        Initialize the PeerClient.
+
+        Args:
+            url: Base URL of the peer, e.g. http://fileserver1:5000
+            timeout: Socket timeout for requests to the peer in seconds
+            max_connections: Maximum number of idle connections kept open
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid peer URL: {url}")
+
+        self.url = url
+        self.timeout = timeout
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self._idle = queue.LifoQueue(maxsize=max_connections)
+
+    def search(self, query: str, limit: int, match_all: bool, sort: str) -> SearchResponse:
+        """
+        Perform a search on the peer.
+
+        Args:
+            query: The search query
+            limit: Maximum number of results to return
+            match_all: Whether to match all words in the query
+            sort: Sort order, one of SORT_OPTIONS
+
+        Returns:
+            A SearchResponse object with results tagged with the peer URL
+
+        Raises:
+            Exception: If the request fails or the peer returns an error
+        """
+        params = urlencode({
+            "q": query,
+            "limit": limit,
+            "match_all": "true" if match_all else "false",
+            "sort": sort
+        })
+        status, body = self._get(f"{self.base_path}{PEER_SEARCH_PATH}?{params}")
+
+        if status != 200:
+            raise Exception(f"HTTP {status}: {self._error_message(body)}")
+
+        data = json.loads(body)
+
+        results = [SearchResult.from_dict(item, source=self.url) for item in data.get("results", [])]
+        return SearchResponse(
+            results=results,
+            query=data.get("query", query),
+            count=len(results),
+            total_count=data.get("total_count"),
+            original_query=data.get("original_query")
+        )
+
+    @staticmethod
+    def _error_message(body: bytes) -> str:
+        """
+        Get the error message of an error response.
+
+        Args:
+            body: The response body, usually JSON but possibly an HTML page from a proxy
+
+        Returns:
+            The 'error' value of a JSON body, otherwise 'unknown error'
+        """
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return "unknown error"
+        if isinstance(data, dict) and data.get("error"):
+            return str(data["error"])
+        return "unknown error"
+
+    def _get(self, path: str) -> Tuple[int, bytes]:
+        """
+        Send a GET request over a pooled connection.
+
+        A reused connection the peer has closed in the meantime is replaced
+        by a fresh one and the request is sent again.
+
+        Args:
+            path: Request path including the query string
+
+        Returns:
+            The HTTP status code and the response body
+        """
+        connection, reused = self._acquire()
+        try:
+            try:
+                status, body = self._send(connection, path)
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                connection.close()
+                connection = self._connect()
+                status, body = self._send(connection, path)
+        except Exception:
+            connection.close()
+            raise
+
+        self._release(connection)
+        return status, body
+
+    @staticmethod
+    def _send(connection: http.client.HTTPConnection, path: str) -> Tuple[int, bytes]:
+        """
+        Send a GET request and read the full response.
+
+        Args:
+            connection: The connection to use
+            path: Request path including the query string
+
+        Returns:
+            The HTTP status code and the response body
+        """
+        connection.request("GET", path, headers={"Accept": "application/json"})
+        response = connection.getresponse()
+        return response.status, response.read()
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take an idle connection from the pool or open a new one.
+
+        Returns:
+            The connection and whether it was reused from the pool
+        """
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._connect(), False
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        """
+        Return a connection to the pool, closing it if the pool is full.
+
+        Args:
+            connection: The connection to return
+        """
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """
+        Create a new connection to the peer.
+
+        Returns:
+            A new HTTPConnection or HTTPSConnection
+        """
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+class FederatedSearchService:
+    """
+    Service for fanning a search out to several Everything API instances and merging the results.
+    """
+    def __init__(self, peers: List[str], timeout: float = 5.0,
+                 search_service: Optional[SearchService] = None, local_name: str = "local"):
+        """
+        Initialize the FederatedSearchService.
+
+        Args:
+            peers: Base URLs of the peer instances
+            timeout: Time to wait for all peers in seconds
+            search_service: Local search service to include in the results (optional)
+            local_name: Source name of results from the local search service
+        """
+        self.timeout = timeout
+        self.search_service = search_service
+        self.local_name = local_name
+        self.peers = [PeerClient(url, timeout) for url in peers]
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(4, len(self.peers) * 4),
+            thread_name_prefix="federation"
+        )
+        logger.info(f"Federated search initialized with {len(self.peers)} peers: {', '.join(peers)}")
+
+    def search(self, query: str, max_results: int = 100, match_all: bool = True,
+               sort: str = "name") -> FederatedSearchResponse:
+        """
+        Perform a search on all peers and the local instance and merge the results.
+
+        Each instance returns its top max_results in Everything's sort order.
+        The merge key follows that order, and every stream is re-sorted with it
+        first. This is nearly free for input that is already sorted, and it keeps
+        the k-way merge correct where Everything's collation differs from the
+        key. The merged stream is cut at max_results.
+        Instances that fail or do not answer within the timeout are reported
+        in the peer statuses and the response is flagged as partial.
+
+        Args:
+            query: The search query
+            max_results: Maximum number of results to return (default: 100)
+            match_all: Whether to match all words in the query (default: True)
+            sort: Sort order, one of SORT_OPTIONS (default: 'name')
+
+        Returns:
+            A FederatedSearchResponse object containing the merged results
+
+        Raises:
+            ValueError: If sort is not supported
+        """
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Invalid sort value: {sort}")
+
+        logger.info(f"Performing federated search with query: '{query}', max_results: {max_results}, "
+                    f"match_all: {match_all}, sort: {sort}")
+
+        start = time.monotonic()
+        futures = {
+            self.executor.submit(self._timed_search, peer, query, max_results, match_all, sort): peer
+            for peer in self.peers
+        }
+
+        responses: List[SearchResponse] = []
+        statuses: List[PeerStatus] = []
+
+        # Search the local instance while the peers are working
+        if self.search_service is not None:
+            local_start = time.monotonic()
+            try:
+                response = self.search_service.search(query, max_results, match_all, sort)
+                for result in response.results:
+                    result.source = self.local_name
+                responses.append(response)
+                statuses.append(PeerStatus(
+                    self.local_name, True, response.count, response.total_count,
+                    (time.monotonic() - local_start) * 1000
+                ))
+            except Exception as e:
+                logger.error(f"Local search failed: {e}")
+                statuses.append(PeerStatus(
+                    self.local_name, False, elapsed_ms=(time.monotonic() - local_start) * 1000, error=str(e)
+                ))
+
+        remaining = max(0.0, self.timeout - (time.monotonic() - start))
+        done, _ = wait(futures, timeout=remaining)
+
+        for future, peer in futures.items():
+            if future not in done:
+                logger.warning(f"Peer {peer.url} timed out after {self.timeout}s")
+                statuses.append(PeerStatus(
+                    peer.url, False, elapsed_ms=(time.monotonic() - start) * 1000,
+                    error=f"Timed out after {self.timeout}s"
+                ))
+                continue
+            try:
+                response, elapsed_ms = future.result()
+                responses.append(response)
+                statuses.append(PeerStatus(peer.url, True, response.count, response.total_count, elapsed_ms))
+            except Exception as e:
+                logger.error(f"Peer {peer.url} failed: {e}")
+                statuses.append(PeerStatus(
+                    peer.url, False, elapsed_ms=(time.monotonic() - start) * 1000, error=str(e)
+                ))
+
+        # Merge the sorted result streams and stop at max_results
+        key, reverse = self._sort_key(sort)
+        streams = [sorted(response.results, key=key, reverse=reverse) for response in responses]
+        merged = heapq.merge(*streams, key=key, reverse=reverse)
+        results = list(islice(merged, max_results))
+
+        partial = not all(status.ok for status in statuses)
+        total_count = sum(response.total_count or 0 for response in responses)
+        logger.info(f"Federated search merged {len(results)} results from {len(responses)} of "
+                    f"{len(statuses)} instances, partial: {partial}")
+
+        return FederatedSearchResponse(
+            results=results,
+            query=query,
+            count=len(results),
+            total_count=total_count,
+            original_query=query if match_all else None,
+            partial=partial,
+            peers=statuses
+        )
+
+    @staticmethod
+    def _timed_search(peer: PeerClient, query: str, max_results: int, match_all: bool,
+                      sort: str) -> Tuple[SearchResponse, float]:
+        """
+        Perform a search on a peer and measure how long it takes.
+
+        Args:
+            peer: The peer to search
+            query: The search query
+            max_results: Maximum number of results to return
+            match_all: Whether to match all words in the query
+            sort: Sort order, one of SORT_OPTIONS
+
+        Returns:
+            The SearchResponse of the peer and the elapsed time in milliseconds
+        """
+        start = time.monotonic()
+        response = peer.search(query, max_results, match_all, sort)
+        return response, (time.monotonic() - start) * 1000
+
+    @staticmethod
+    def _sort_key(sort: str) -> Tuple[Callable[[SearchResult], Any], bool]:
+        """
+        Get the merge key following an Everything sort order.
+
+        Path sorts by the parent folder and then by name, as Everything does.
+        Results without a size or date, typically folders, come first in
+        ascending order.
+
+        Args:
+            sort: Sort order, one of SORT_OPTIONS
+
+        Returns:
+            The key function and whether the order is descending
+        """
+        field = sort[:-len("_desc")] if sort.endswith("_desc") else sort
+        reverse = sort.endswith("_desc")
+
+        if field == "path":
+            return (lambda result: (
+                ntpath.dirname(result.path or "").lower(), (result.filename or "").lower()
+            )), reverse
+        if field == "size":
+            return (lambda result: (result.size is not None, result.size or 0)), reverse
+        if field == "date_modified":
+            return (lambda result: (
+                result.date_modified is not None, result.date_modified or datetime.min
+            )), reverse
+        return (lambda result: (
+            (result.filename or "").lower(), ntpath.dirname(result.path or "").lower()
+        )), reverse
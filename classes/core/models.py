@@ -2,7 +2,7 @@
 Data models for the Everything API.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
@@ -15,7 +15,8 @@ class SearchResult:
         filename: str,
         path: str,
         size: Optional[int] = None,
-        date_modified: Optional[datetime] = None
+        date_modified: Optional[datetime] = None,
+        source: Optional[str] = None
     ):
         """
         Initialize a SearchResult object.
@@ -25,11 +26,40 @@ class SearchResult:
             path: The full path to the file or folder
             size: The size of the file in bytes
             date_modified: The date the file was last modified
+            source: The instance the result was found on (federated searches only)
         """
         self.filename = filename
         self.path = path
         self.size = size
         self.date_modified = date_modified
+        self.source = source
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], source: Optional[str] = None) -> "SearchResult":
+        """
+        Create a SearchResult object from its dictionary representation.
+
+        Args:
+            data: A dictionary as produced by to_dict
+            source: The instance the result was found on
+
+        Returns:
+            A SearchResult object
+        """
+        date_modified = None
+        if data.get("date_modified"):
+            try:
+                date_modified = datetime.fromisoformat(data["date_modified"])
+            except (TypeError, ValueError) as e:
+                logging.warning(f"Failed to parse date_modified '{data['date_modified']}': {e}")
+
+        return cls(
+            filename=data.get("filename") or "",
+            path=data.get("path") or "",
+            size=data.get("size"),
+            date_modified=date_modified,
+            source=source
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -48,12 +78,18 @@ class SearchResult:
                     logging.warning(f"Failed to convert date_modified to ISO format: {e}")
                     date_modified_str = str(self.date_modified)
                     
-            return {
+            result_dict = {
                 "filename": str(self.filename) if self.filename is not None else None,
                 "path": str(self.path) if self.path is not None else None,
                 "size": self.size,
                 "date_modified": date_modified_str
             }
+
+            # Include source if available
+            if self.source:
+                result_dict["source"] = self.source
+
+            return result_dict
         except Exception as e:
             logging.error(f"Error converting SearchResult to dict: {e}")
             # Return a safe fallback
@@ -65,6 +101,27 @@ class SearchResult:
             }
 
 
+class SearchParams:
+    """
+    Represents the validated parameters of a search request.
+    """
+    def __init__(self, query: str, match_all: bool = True, limit: Optional[int] = None,
+                 sort: Optional[str] = None):
+        """
+        Initialize a SearchParams object.
+
+        Args:
+            query: The search query
+            match_all: Whether to match all words in the query
+            limit: Maximum number of results to return (paged requests only)
+            sort: Sort order of the results (paged requests only)
+        """
+        self.query = query
+        self.match_all = match_all
+        self.limit = limit
+        self.sort = sort
+
+
 class SearchResponse:
     """
     Represents a response from the search API.
@@ -143,3 +200,183 @@ class SearchResponse:
                 fallback["original_query"] = self.original_query
                 
             return fallback
+
+
+class PeerStatus:
+    """
+    Represents the outcome of a federated search on a single instance.
+    """
+    def __init__(self, source: str, ok: bool, count: int = 0, total_count: Optional[int] = None,
+                 elapsed_ms: float = 0.0, error: Optional[str] = None):
+        """
+        Initialize a PeerStatus object.
+
+        Args:
+            source: The instance that was queried
+            ok: Whether the instance answered in time without errors
+            count: The number of results returned by the instance
+            total_count: The total number of results found by the instance before filtering
+            elapsed_ms: The time the instance took to answer in milliseconds
+            error: The error message if the instance failed or timed out
+        """
+        self.source = source
+        self.ok = ok
+        self.count = count
+        self.total_count = total_count
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the PeerStatus object to a dictionary.
+
+        Returns:
+            A dictionary representation of the PeerStatus
+        """
+        status_dict = {
+            "source": self.source,
+            "ok": self.ok,
+            "count": self.count,
+            "total_count": self.total_count,
+            "elapsed_ms": round(self.elapsed_ms, 1)
+        }
+
+        # Include error if available
+        if self.error:
+            status_dict["error"] = self.error
+
+        return status_dict
+
+
+class FederatedSearchResponse(SearchResponse):
+    """
+    Represents a response from the federated search API.
+    """
+    def __init__(self, results: list[SearchResult], query: str, count: int,
+                 total_count: Optional[int] = None, original_query: Optional[str] = None,
+                 partial: bool = False, peers: Optional[List[PeerStatus]] = None):
+        """
+        Initialize a FederatedSearchResponse object.
+
+        Args:
+            results: List of merged SearchResult objects
+            query: The search query that was used
+            count: The number of merged results
+            total_count: The total number of results of all answering instances before filtering
+            original_query: The original query before modification (if any)
+            partial: Whether at least one instance failed or timed out
+            peers: List of PeerStatus objects, one per queried instance
+        """
+        super().__init__(results, query, count, total_count, original_query)
+        self.partial = partial
+        self.peers = peers or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the FederatedSearchResponse object to a dictionary.
+
+        Returns:
+            A dictionary representation of the FederatedSearchResponse
+        """
+        response_dict = super().to_dict()
+        response_dict["partial"] = self.partial
+        response_dict["peers"] = [peer.to_dict() for peer in self.peers]
+        return response_dict
+
+
+class AggregateBucket:
+    """
+    Represents a single group or histogram bucket of an aggregation.
+    """
+    def __init__(self, key: str, count: int = 0, total_size: int = 0):
+        """
+        Initialize an AggregateBucket object.
+
+        Args:
+            key: The group key (extension, directory or date bucket)
+            count: The number of results in the bucket
+            total_size: The combined size of the files in the bucket in bytes
+        """
+        self.key = key
+        self.count = count
+        self.total_size = total_size
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the AggregateBucket object to a dictionary.
+
+        Returns:
+            A dictionary representation of the AggregateBucket
+        """
+        return {
+            "key": self.key,
+            "count": self.count,
+            "total_size": self.total_size
+        }
+
+
+class AggregateResponse:
+    """
+    Represents a response from the aggregate API.
+    """
+    def __init__(self, query: str, count: int, total_count: int, folder_count: int = 0,
+                 total_size: int = 0, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 group_by: Optional[str] = None, groups: Optional[List[AggregateBucket]] = None,
+                 histogram_interval: Optional[str] = None,
+                 histogram: Optional[List[AggregateBucket]] = None):
+        """
+        Initialize an AggregateResponse object.
+
+        Args:
+            query: The search query that was used
+            count: The number of results after filtering
+            total_count: The total number of results before filtering
+            folder_count: The number of folders among the filtered results
+            total_size: The combined size of all matching files in bytes
+            min_size: The size of the smallest matching file (if any)
+            max_size: The size of the largest matching file (if any)
+            group_by: The grouping that was applied (if any)
+            groups: List of AggregateBucket objects, one per group
+            histogram_interval: The date histogram interval that was applied (if any)
+            histogram: List of AggregateBucket objects, one per date bucket
+        """
+        self.query = query
+        self.count = count
+        self.total_count = total_count
+        self.folder_count = folder_count
+        self.total_size = total_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.group_by = group_by
+        self.groups = groups or []
+        self.histogram_interval = histogram_interval
+        self.histogram = histogram or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the AggregateResponse object to a dictionary.
+
+        Returns:
+            A dictionary representation of the AggregateResponse
+        """
+        response_dict = {
+            "query": self.query,
+            "count": self.count,
+            "total_count": self.total_count,
+            "folder_count": self.folder_count,
+            "total_size": self.total_size,
+            "min_size": self.min_size,
+            "max_size": self.max_size
+        }
+
+        # Include groups if a grouping was requested
+        if self.group_by:
+            response_dict["group_by"] = self.group_by
+            response_dict["groups"] = [group.to_dict() for group in self.groups]
+
+        # Include histogram if an interval was requested
+        if self.histogram_interval:
+            response_dict["histogram_interval"] = self.histogram_interval
+            response_dict["histogram"] = [bucket.to_dict() for bucket in self.histogram]
+
+        return response_dict
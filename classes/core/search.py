@@ -1,36 +1,65 @@
 """
 Core search functionality for the Everything API.
 """
-import os
+import ntpath
 import logging
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional
 
-from classes.external.everything import Everything, Request
-from classes.core.models import SearchResult, SearchResponse
+from classes.external.everything import Everything, Request, Sort
+from classes.core.models import SearchResult, SearchResponse, AggregateBucket, AggregateResponse
 
 logger = logging.getLogger(__name__)
 
+# Supported sort orders for search queries, mapped to the Everything SDK sort
+SORT_OPTIONS = {
+    "name": Sort.NameAscending,
+    "name_desc": Sort.NameDescending,
+    "path": Sort.PathAscending,
+    "path_desc": Sort.PathDescending,
+    "size": Sort.SizeAscending,
+    "size_desc": Sort.SizeDescending,
+    "date_modified": Sort.DateModifiedAscending,
+    "date_modified_desc": Sort.DateModifiedDescending
+}
+
+# Supported groupings for aggregate queries
+GROUP_BY_OPTIONS = ("extension", "directory")
+
+# Supported date histogram intervals and their bucket key formats
+HISTOGRAM_INTERVALS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+    "day": "%Y-%m-%d"
+}
+
 
 class SearchService:
     """
     Service for performing searches using the Everything SDK.
     """
-    def __init__(self, dll_path: str):
+    # The SDK keeps the search, flags, sort and result list as process-global state,
+    # so one query is set up and read at a time across all instances and threads
+    _sdk_lock = threading.Lock()
+
+    def __init__(self, dll_path: str, everything: Optional[Everything] = None):
         """
         Initialize the SearchService.
 
         Args:
             dll_path: Path to the Everything64.dll file
+            everything: An already loaded Everything SDK instance to use instead of loading dll_path (optional)
         """
         self.dll_path = dll_path
         try:
-            self.everything = Everything(dll_path)
+            self.everything = everything if everything is not None else Everything(dll_path)
             logger.info("Everything SDK initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Everything SDK: {e}")
             raise
 
-    def search(self, query: str, max_results: int = 100, match_all: bool = True) -> SearchResponse:
+    def search(self, query: str, max_results: int = 100, match_all: bool = True,
+               sort: str = "name") -> SearchResponse:
         """
         Perform a search using the Everything SDK.
 
@@ -38,86 +67,95 @@ class SearchService:
             query: The search query
             max_results: Maximum number of results to return (default: 100)
             match_all: Whether to match all words in the query (default: True)
+            sort: Sort order, one of SORT_OPTIONS (default: 'name')
 
         Returns:
             A SearchResponse object containing the search results
 
         Raises:
+            ValueError: If sort is not supported
             Exception: If the search fails
         """
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Invalid sort value: {sort}")
+
         # Store original query
         original_query = query
         
-        # Get search terms for filtering
-        search_terms = [term.strip().lower() for term in query.split() if term.strip()]
-        
-        logger.info(f"Performing search with query: '{query}', max_results: {max_results}, match_all: {match_all}")
-        
-        # Set search options - use original query without modification
-        self.everything.set_search(query)
-        self.everything.set_request_flags(
-            Request.FullPathAndFileName | Request.DateModified | Request.Size
-        )
-        
-        # Execute the search
-        if not self.everything.query():
-            error = self.everything.get_last_error()
-            logger.error(f"Search failed: {error}")
-            raise Exception(f"Search failed: {error}")
+        # Get plain search terms for filtering, Everything syntax is already applied by the query
+        search_terms = self._plain_terms(query)
         
-        # Get initial results from Everything SDK
-        initial_results = []
-        total_initial_results = len(self.everything)
-        logger.info(f"Found {total_initial_results} initial results from Everything SDK")
+        logger.info(f"Performing search with query: '{query}', max_results: {max_results}, "
+                    f"match_all: {match_all}, sort: {sort}")
         
-        # Process all results first
-        for i in range(total_initial_results):
-            try:
-                item = self.everything[i]
-                
-                # Get filename with error handling
-                try:
-                    raw_filename = item.get_filename()
-                    filename = os.path.basename(raw_filename) if raw_filename else ""
-                    path = raw_filename or ""
-                except Exception as e:
-                    logger.warning(f"Error getting filename for result {i}: {e}")
-                    filename = f"Error retrieving filename: {str(e)[:50]}"
-                    path = "Unknown path"
-                
-                # Get size with error handling
-                try:
-                    size = item.get_size()
-                except Exception as e:
-                    logger.warning(f"Error getting size for result {i}: {e}")
-                    size = None
-                
-                # Get date_modified with error handling
+        # Hold the SDK from setting up the query until all results are read
+        with self._sdk_lock:
+            # Set search options - use original query without modification
+            self.everything.set_search(query)
+            self.everything.set_request_flags(
+                Request.FullPathAndFileName | Request.DateModified | Request.Size
+            )
+            self.everything.set_sort(SORT_OPTIONS[sort])
+            
+            # Execute the search
+            if not self.everything.query():
+                error = self.everything.get_last_error()
+                logger.error(f"Search failed: {error}")
+                raise Exception(f"Search failed: {error}")
+            
+            # Get initial results from Everything SDK
+            initial_results = []
+            total_initial_results = len(self.everything)
+            logger.info(f"Found {total_initial_results} initial results from Everything SDK")
+            
+            # Process all results first
+            for i in range(total_initial_results):
                 try:
-                    date_modified = item.get_date_modified()
+                    item = self.everything[i]
+                    
+                    # Get filename with error handling
+                    try:
+                        raw_filename = item.get_filename()
+                        filename = ntpath.basename(raw_filename) if raw_filename else ""
+                        path = raw_filename or ""
+                    except Exception as e:
+                        logger.warning(f"Error getting filename for result {i}: {e}")
+                        filename = f"Error retrieving filename: {str(e)[:50]}"
+                        path = "Unknown path"
+                    
+                    # Get size with error handling
+                    try:
+                        size = item.get_size()
+                    except Exception as e:
+                        logger.warning(f"Error getting size for result {i}: {e}")
+                        size = None
+                    
+                    # Get date_modified with error handling
+                    try:
+                        date_modified = item.get_date_modified()
+                    except Exception as e:
+                        logger.warning(f"Error getting date_modified for result {i}: {e}")
+                        date_modified = None
+                    
+                    # Create SearchResult object
+                    result = SearchResult(
+                        filename=filename,
+                        path=path,
+                        size=size,
+                        date_modified=date_modified
+                    )
+                    initial_results.append(result)
+                    
                 except Exception as e:
-                    logger.warning(f"Error getting date_modified for result {i}: {e}")
-                    date_modified = None
-                
-                # Create SearchResult object
-                result = SearchResult(
-                    filename=filename,
-                    path=path,
-                    size=size,
-                    date_modified=date_modified
-                )
-                initial_results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Error processing search result {i}: {e}")
-                # Add a placeholder result to maintain the count
-                initial_results.append(SearchResult(
-                    filename=f"Error processing result {i}",
-                    path="Error",
-                    size=0,
-                    date_modified=None
-                ))
-        
+                    logger.error(f"Error processing search result {i}: {e}")
+                    # Add a placeholder result to maintain the count
+                    initial_results.append(SearchResult(
+                        filename=f"Error processing result {i}",
+                        path="Error",
+                        size=0,
+                        date_modified=None
+                    ))
+            
         # Apply filtering if match_all is True
         results = []
         if match_all and search_terms:
@@ -150,3 +188,179 @@ class SearchService:
             total_count=total_initial_results,
             original_query=original_query if match_all else None
         )
+
+    def aggregate(self, query: str, match_all: bool = True, group_by: Optional[str] = None,
+                  histogram: Optional[str] = None) -> AggregateResponse:
+        """
+        Compute counts, size statistics, groups and a date histogram over a search.
+
+        Only the columns needed for the requested aggregation are fetched from
+        Everything, and the hit list is consumed in a single pass without
+        building SearchResult objects. Folders are counted but excluded from
+        the size statistics.
+
+        Args:
+            query: The search query
+            match_all: Whether to match all words in the query (default: True)
+            group_by: Group results by 'extension' or top-level 'directory' (optional)
+            histogram: Date modified histogram interval: 'year', 'month' or 'day' (optional)
+
+        Returns:
+            An AggregateResponse object containing the aggregated values
+
+        Raises:
+            ValueError: If group_by or histogram is not supported
+            Exception: If the search fails
+        """
+        if group_by is not None and group_by not in GROUP_BY_OPTIONS:
+            raise ValueError(f"Invalid group_by value: {group_by}")
+        if histogram is not None and histogram not in HISTOGRAM_INTERVALS:
+            raise ValueError(f"Invalid histogram value: {histogram}")
+
+        # Get plain search terms for filtering, Everything syntax is already applied by the query
+        filter_terms = self._plain_terms(query) if match_all else []
+
+        logger.info(f"Performing aggregate with query: '{query}', match_all: {match_all}, "
+                    f"group_by: {group_by}, histogram: {histogram}")
+
+        # Request only the columns the aggregation needs
+        need_path = bool(filter_terms) or group_by is not None
+        flags = Request.Size
+        if need_path:
+            flags |= Request.FullPathAndFileName
+        if histogram:
+            flags |= Request.DateModified
+
+        # Hold the SDK from setting up the query until all results are read
+        with self._sdk_lock:
+            self.everything.set_search(query)
+            self.everything.set_request_flags(flags)
+            # The order does not matter here, so avoid sorting by whatever the last search used
+            self.everything.set_sort(Sort.NameAscending)
+
+            # Execute the search
+            if not self.everything.query():
+                error = self.everything.get_last_error()
+                logger.error(f"Aggregate search failed: {error}")
+                raise Exception(f"Search failed: {error}")
+
+            total_count = len(self.everything)
+            logger.info(f"Aggregating {total_count} results from Everything SDK")
+
+            # Read the columns through one reader so the buffers are allocated only once
+            reader = self.everything.reader()
+            date_format = HISTOGRAM_INTERVALS[histogram] if histogram else None
+
+            count = 0
+            folder_count = 0
+            total_size = 0
+            min_size = None
+            max_size = None
+            groups: Dict[str, AggregateBucket] = {}
+            buckets: Dict[str, AggregateBucket] = {}
+
+            for i in range(total_count):
+                path = (reader.get_filename(i) or "") if need_path else ""
+
+                if filter_terms:
+                    path_lower = path.lower()
+                    if not all(term in path_lower for term in filter_terms):
+                        continue
+
+                count += 1
+
+                # Folders are counted, but their sizes would double count their contents
+                size = 0
+                if reader.is_folder(i):
+                    folder_count += 1
+                else:
+                    file_size = reader.get_size(i)
+                    if file_size is not None:
+                        size = file_size
+                        total_size += size
+                        if min_size is None or size < min_size:
+                            min_size = size
+                        if max_size is None or size > max_size:
+                            max_size = size
+
+                if group_by:
+                    if group_by == "extension":
+                        key = ntpath.splitext(path)[1].lower()
+                    else:
+                        key = self._top_level_directory(path)
+                    group = groups.get(key)
+                    if group is None:
+                        group = groups[key] = AggregateBucket(key)
+                    group.count += 1
+                    group.total_size += size
+
+                if date_format:
+                    key = "unknown"
+                    try:
+                        date_modified = reader.get_date_modified(i)
+                        if date_modified is not None:
+                            key = date_modified.strftime(date_format)
+                    except (OverflowError, OSError, ValueError):
+                        pass
+                    bucket = buckets.get(key)
+                    if bucket is None:
+                        bucket = buckets[key] = AggregateBucket(key)
+                    bucket.count += 1
+                    bucket.total_size += size
+
+        logger.info(f"Aggregated {count} of {total_count} results, total size: {total_size} bytes")
+
+        return AggregateResponse(
+            query=query,
+            count=count,
+            total_count=total_count,
+            folder_count=folder_count,
+            total_size=total_size,
+            min_size=min_size,
+            max_size=max_size,
+            group_by=group_by,
+            groups=sorted(groups.values(), key=lambda group: (-group.count, group.key)),
+            histogram_interval=histogram,
+            histogram=sorted(buckets.values(), key=lambda bucket: bucket.key)
+        )
+
+    @staticmethod
+    def _plain_terms(query: str) -> List[str]:
+        """
+        Get the lowercase search terms of a query that are checked against the path with match_all.
+
+        Terms using Everything search syntax never appear literally in a path
+        and are skipped: functions and modifiers ('ext:mkv', 'size:>1gb'),
+        wildcards ('*.mkv', 'file?.txt'), OR ('mkv|avi', '|'), comparisons
+        ('<', '>') and negations ('!tmp').
+
+        Args:
+            query: The search query
+
+        Returns:
+            List of plain search terms
+        """
+        terms = []
+        for term in query.split():
+            term = term.strip().strip('"').lower()
+            if not term or term.startswith("!") or any(char in term for char in ':*?|<>'):
+                continue
+            terms.append(term)
+        return terms
+
+    @staticmethod
+    def _top_level_directory(path: str) -> str:
+        """
+        Get the top-level directory of a path, e.g. 'C:\\Videos' for 'C:\\Videos\\a\\b.mkv'.
+
+        Args:
+            path: The full path of a result
+
+        Returns:
+            The drive joined with the first directory below it, or the drive root
+        """
+        drive, rest = ntpath.splitdrive(path)
+        parts = [part for part in rest.split("\\") if part]
+        if len(parts) > 1:
+            return f"{drive}\\{parts[0]}"
+        return f"{drive}\\"
@@ -13,6 +13,13 @@ from ctypes.wintypes import *
 from struct import calcsize, unpack
 
 MAX_PATH: Final = 32767
+FILETIME_EPOCH_OFFSET: Final = 116444736000000000  # 100ns ticks between 1601-01-01 and 1970-01-01
+
+def filetime_to_datetime(winticks:int):
+    """
+    Converts a FILETIME value (100ns ticks since 1601-01-01) to a local datetime.
+    """
+    return dt.datetime.fromtimestamp((winticks - FILETIME_EPOCH_OFFSET) / 10000000)
 
 class Request(IntEnum):
     FileName                       = 0x00000001
@@ -33,6 +40,22 @@ class Request(IntEnum):
     HighlightedFullPathAndFileName = 0x00008000
     All                            = 0x0000FFFF
 
+class Sort(IntEnum):
+    NameAscending                  = 1
+    NameDescending                 = 2
+    PathAscending                  = 3
+    PathDescending                 = 4
+    SizeAscending                  = 5
+    SizeDescending                 = 6
+    ExtensionAscending             = 7
+    ExtensionDescending            = 8
+    TypeNameAscending              = 9
+    TypeNameDescending             = 10
+    DateCreatedAscending           = 11
+    DateCreatedDescending          = 12
+    DateModifiedAscending          = 13
+    DateModifiedDescending         = 14
+
 class Error(Enum):
     Ok              = 0  # The operation completed successfully.
     Memory          = 1  # Failed to allocate memory for the search query.
@@ -123,9 +146,56 @@ class ItemIterator:
         filetime_date = ULARGE_INTEGER()
         if self.everything(f'GetResultDate{tdate}', self.index, filetime_date):
             winticks = int(unpack('<Q', filetime_date)[0])
-            return dt.datetime.fromtimestamp((winticks - 116444736000000000) / 10000000)
+            return filetime_to_datetime(winticks)
+        return None
+
+class ResultReader:
+    """
+    Reads columns of visible results by index for tight loops over many results.
+    Unlike ``ItemIterator`` it resolves the SDK functions and allocates its buffers only once.
+    """
+    def __init__(self, everything):
+        self._get_full_path_name = everything.GetResultFullPathNameW
+        self._get_size = everything.GetResultSize
+        self._get_date_modified = everything.GetResultDateModified
+        self._is_folder = everything.IsFolderResult
+        self._path = ctypes.create_unicode_buffer(MAX_PATH)
+        self._size = ULARGE_INTEGER()
+        self._date = ULARGE_INTEGER()
+
+    def get_filename(self, index:int):
+        """
+        Gets the full path and file name of a visible result.
+        :return: Returns a string if successful, otherwise returns None.
+        """
+        if self._get_full_path_name(index, self._path, MAX_PATH):
+            return self._path.value
+        return None
+
+    def get_size(self, index:int):
+        """
+        Gets the size of a visible result.
+        :return: Returns the size if successful, otherwise returns None.
+        """
+        if self._get_size(index, self._size):
+            return self._size.value
         return None
 
+    def get_date_modified(self, index:int):
+        """
+        Gets the modified date of a visible result.
+        :return: Returns a datetime if successful, otherwise returns None.
+        """
+        if self._get_date_modified(index, self._date):
+            return filetime_to_datetime(self._date.value)
+        return None
+
+    def is_folder(self, index:int):
+        """
+        Determines if a visible result is a folder.
+        """
+        return bool(self._is_folder(index))
+
 class Everything:
     def __init__(self, dll=None):
         """
@@ -141,6 +211,7 @@ class Everything:
         self.func(None, 'SetSearchW', LPCWSTR)
         self.func(None, 'SetRegex', BOOL)
         self.func(None, 'SetRequestFlags', DWORD)
+        self.func(None, 'SetSort', DWORD)
         self.func(DWORD, 'GetResultListRequestFlags')
         self.func(DWORD, 'GetResultFullPathNameW', DWORD, LPWSTR, DWORD)
         self.func(DWORD, 'GetNumResults')
@@ -176,6 +247,12 @@ class Everything:
     def __iter__(self):
         return ItemIterator(self, -1)
 
+    def reader(self):
+        """
+        Gets a ``ResultReader`` for the current results.
+        """
+        return ResultReader(self)
+
     def func(self, restype, name:str, *argtypes):
         func = getattr(self.dll, f'Everything_{name}')
         func.restype = restype
@@ -209,6 +286,13 @@ class Everything:
         """
         self.SetRequestFlags(flags)
 
+    def set_sort(self, sort:Sort):
+        """
+        Sets how the results should be ordered.
+        The default sort is ``Sort.NameAscending``.
+        """
+        self.SetSort(sort)
+
     def get_result_list_request_flags(self):
         """
         Gets the flags of available result data.
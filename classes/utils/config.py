@@ -40,6 +40,21 @@ class Config:
             "max_results": "100"
         }
         
+        self.config["Federation"] = {
+            "peers": "",
+            "timeout": "5",
+            "include_local": "true",
+            "local_name": "local"
+        }
+        
+        self.config["Profiling"] = {
+            "enabled": "false",
+            "admin_token": "",
+            "sample_every": "0",
+            "max_reports": "20",
+            "top_functions": "30"
+        }
+        
         self.config["Logging"] = {
             "level": "INFO",
             "log_file": "everything_api.log"
@@ -92,6 +107,20 @@ class Config:
         """
         return self.config.getint(section, option, fallback=fallback)
     
+    def get_float(self, section: str, option: str, fallback: Optional[float] = None) -> float:
+        """
+        Get a configuration value as a float.
+
+        Args:
+            section: The configuration section
+            option: The configuration option
+            fallback: Fallback value if the option is not found
+
+        Returns:
+            The configuration value as a float
+        """
+        return self.config.getfloat(section, option, fallback=fallback)
+    
     def get_bool(self, section: str, option: str, fallback: Optional[bool] = None) -> bool:
         """
         Get a configuration value as a boolean.
@@ -0,0 +1,267 @@
+"""
+On-demand request profiling for the Everything API.
+"""
+import io
+import hmac
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Number of allocation sites listed in a report
+TOP_ALLOCATIONS = 10
+
+
+class ProfileReport:
+    """
+    Represents the cProfile and tracemalloc report of a single request.
+    """
+    def __init__(self, report_id: int, request: str, trigger: str, created: datetime,
+                 duration_ms: float, retained_blocks: int, retained_size: int, peak_memory: int,
+                 stats: str, top_allocations: List[str]):
+        """
+        Initialize a ProfileReport object.
+
+        Args:
+            report_id: Sequential id of the report
+            request: The profiled request path including the query string
+            trigger: Why the request was profiled ('requested' or 'sampled')
+            created: When the request was profiled
+            duration_ms: Wall clock time of the profiled call in milliseconds
+            retained_blocks: Net number of memory blocks allocated during the call and still alive at its end
+            retained_size: Net size of those blocks in bytes
+            peak_memory: Peak traced memory during the call in bytes
+            stats: cProfile statistics sorted by cumulative time
+            top_allocations: The source lines that retained the most memory
+        """
+        self.report_id = report_id
+        self.request = request
+        self.trigger = trigger
+        self.created = created
+        self.duration_ms = duration_ms
+        self.retained_blocks = retained_blocks
+        self.retained_size = retained_size
+        self.peak_memory = peak_memory
+        self.stats = stats
+        self.top_allocations = top_allocations
+
+    def to_summary_dict(self) -> Dict[str, Any]:
+        """
+        Convert the ProfileReport object to a dictionary without the detailed statistics.
+
+        Returns:
+            A summary dictionary representation of the ProfileReport
+        """
+        return {
+            "id": self.report_id,
+            "request": self.request,
+            "trigger": self.trigger,
+            "created": self.created.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "retained_blocks": self.retained_blocks,
+            "retained_size": self.retained_size,
+            "peak_memory": self.peak_memory
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the ProfileReport object to a dictionary.
+
+        Returns:
+            A dictionary representation of the ProfileReport
+        """
+        report_dict = self.to_summary_dict()
+        report_dict["top_allocations"] = self.top_allocations
+        report_dict["stats"] = self.stats
+        return report_dict
+
+
+class RequestProfiler:
+    """
+    Profiles requested or sampled calls and keeps the last reports in a ring buffer.
+    """
+    def __init__(self, enabled: bool = False, admin_token: str = "", sample_every: int = 0,
+                 max_reports: int = 20, top_functions: int = 30):
+        """
+        Initialize the RequestProfiler.
+
+        Args:
+            enabled: Whether profiling is allowed at all
+            admin_token: Token required to request profiling and read reports
+            sample_every: Profile every Nth call automatically (0 disables sampling)
+            max_reports: Number of reports kept in the ring buffer
+            top_functions: Number of functions listed in the cProfile statistics
+        """
+        self.enabled = enabled
+        self.admin_token = admin_token
+        self.sample_every = sample_every
+        self.top_functions = top_functions
+        self._reports: deque = deque(maxlen=max(1, max_reports))
+        self._calls = 0
+        self._next_id = 1
+        self._state_lock = threading.Lock()
+        # cProfile and tracemalloc are process wide, so only one call is profiled at a time
+        self._profile_lock = threading.Lock()
+
+    def is_authorized(self, token: Optional[str]) -> bool:
+        """
+        Check whether a token grants access to profiling.
+
+        Args:
+            token: The token sent by the client
+
+        Returns:
+            True if profiling is enabled and the token matches the admin token
+        """
+        if not self.enabled or not self.admin_token or not token:
+            return False
+        return hmac.compare_digest(token.encode(), self.admin_token.encode())
+
+    def run(self, request: str, requested: bool, func: Callable[..., Any],
+            *args: Any) -> Tuple[Any, Optional[ProfileReport]]:
+        """
+        Call a function, profiling it if requested or if the call is sampled.
+
+        Args:
+            request: The request path including the query string
+            requested: Whether the client explicitly asked for profiling
+            func: The function to call
+            *args: Arguments for the function
+
+        Returns:
+            The return value of the function and the ProfileReport if the call was profiled
+        """
+        if not self.enabled:
+            return func(*args), None
+
+        trigger = "requested" if requested else None
+        if self.sample_every > 0:
+            with self._state_lock:
+                self._calls += 1
+                if trigger is None and self._calls % self.sample_every == 0:
+                    trigger = "sampled"
+
+        if trigger is None:
+            return func(*args), None
+
+        if not self._profile_lock.acquire(blocking=False):
+            logger.info(f"Skipping profiling of {request}, another request is being profiled")
+            return func(*args), None
+
+        try:
+            return self._profile(request, trigger, func, *args)
+        finally:
+            self._profile_lock.release()
+
+    def get_reports(self) -> List[ProfileReport]:
+        """
+        Get the stored reports.
+
+        Returns:
+            List of ProfileReport objects, newest first
+        """
+        with self._state_lock:
+            return list(reversed(self._reports))
+
+    def get_report(self, report_id: int) -> Optional[ProfileReport]:
+        """
+        Get a stored report by id.
+
+        Args:
+            report_id: The id of the report
+
+        Returns:
+            The ProfileReport, or None if it is unknown or was evicted
+        """
+        with self._state_lock:
+            for report in self._reports:
+                if report.report_id == report_id:
+                    return report
+        return None
+
+    def _profile(self, request: str, trigger: str, func: Callable[..., Any],
+                 *args: Any) -> Tuple[Any, Optional[ProfileReport]]:
+        """
+        Call a function under cProfile and tracemalloc and store the report.
+
+        Up to Python 3.11 cProfile only records the calling thread, so work handed to
+        other threads (e.g. the federated peer requests) shows up as waiting time.
+        From Python 3.12 it records all threads, so the statistics also contain the
+        peer requests and any concurrent requests. tracemalloc traces all threads,
+        so allocations of concurrent requests are always included.
+
+        If another profiler is already active (Python 3.12+ allows only one), the
+        function is called without profiling.
+
+        Args:
+            request: The request path including the query string
+            trigger: Why the call is profiled
+            func: The function to call
+            *args: Arguments for the function
+
+        Returns:
+            The return value of the function and the stored ProfileReport,
+            or None if the call could not be profiled
+        """
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        created = datetime.now()
+        start = time.perf_counter()
+        try:
+            try:
+                profiler.enable()
+            except ValueError as e:
+                logger.warning(f"Not profiling {request}: {e}")
+                return func(*args), None
+            try:
+                result = func(*args)
+            finally:
+                profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            peak_memory = max(0, tracemalloc.get_traced_memory()[1] - baseline_memory)
+            after = tracemalloc.take_snapshot()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        # Ignore the profiling bookkeeping itself
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        differences = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        retained = [difference for difference in differences if difference.size_diff > 0]
+
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.top_functions)
+
+        with self._state_lock:
+            report = ProfileReport(
+                report_id=self._next_id,
+                request=request,
+                trigger=trigger,
+                created=created,
+                duration_ms=duration_ms,
+                retained_blocks=sum(max(0, difference.count_diff) for difference in retained),
+                retained_size=sum(difference.size_diff for difference in retained),
+                peak_memory=peak_memory,
+                stats=stream.getvalue(),
+                top_allocations=[str(difference) for difference in retained[:TOP_ALLOCATIONS]]
+            )
+            self._next_id += 1
+            self._reports.append(report)
+
+        logger.info(f"Profiled {request} ({trigger}) as report {report.report_id}: "
+                    f"{duration_ms:.1f} ms, peak memory {peak_memory} bytes")
+        return result, report
@@ -0,0 +1,126 @@
+"""
+Shared fixtures for the Everything API tests.
+"""
+import os
+import time
+import threading
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+import pytest
+from flask import Response, jsonify
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from classes.api.server import EverythingAPIServer
+from classes.core.search import SearchService
+from classes.utils.config import Config
+from tests.fake_everything import FakeEntry, FakeEverything
+
+
+def make_config(**options: str) -> Config:
+    """
+    Create a Config with default values and the given overrides.
+
+    Args:
+        **options: Overrides named '<section>__<option>', e.g. Profiling__enabled='true'
+
+    Returns:
+        A Config object that is not backed by a settings file
+    """
+    config = Config(os.devnull)
+    for name, value in options.items():
+        section, option = name.split("__")
+        config.set(section, option, value)
+    return config
+
+
+def make_search_service(entries: List[FakeEntry]) -> SearchService:
+    """
+    Create a SearchService backed by the fake Everything SDK.
+
+    Args:
+        entries: The entries of the fake index
+
+    Returns:
+        A SearchService searching the given entries
+    """
+    return SearchService("Everything64.dll", everything=FakeEverything(entries))
+
+
+class StandInPeer:
+    """
+    Peer Everything API instance serving the real Flask app over the fake backend.
+    """
+    def __init__(self, entries: List[FakeEntry], delay: float = 0.0, status: int = 200,
+                 error_page: bool = False, idle_timeout: Optional[float] = None):
+        """
+        Initialize and start the StandInPeer.
+
+        Args:
+            entries: The entries of the peer's fake index
+            delay: Seconds to wait before handling a request
+            status: HTTP status to answer with, any other status than 200 skips the search
+            error_page: Answer errors with an HTML page, like a reverse proxy, instead of JSON
+            idle_timeout: Seconds after which an idle connection is closed without telling the client
+        """
+        self.delay = delay
+        self.status = status
+        self.error_page = error_page
+        self.connections = 0
+        self.lock = threading.Lock()
+
+        app = EverythingAPIServer(make_config(), make_search_service(entries)).app
+        app.before_request(self._before_request)
+
+        peer = self
+
+        class Handler(WSGIRequestHandler):
+            timeout = idle_timeout
+
+            def setup(self) -> None:
+                super().setup()
+                with peer.lock:
+                    peer.connections += 1
+
+            def log(self, type: str, message: str, *args) -> None:
+                pass
+
+        self.server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def _before_request(self) -> Optional[Tuple[Union[Response, str], int]]:
+        """
+        Delay the request and answer with the configured error status, if any.
+        """
+        time.sleep(self.delay)
+        if self.status == 200:
+            return None
+        if self.error_page:
+            return "<html><body><h1>Bad Gateway</h1></body></html>", self.status
+        return jsonify({"error": "Stand-in failure"}), self.status
+
+    def stop(self) -> None:
+        """
+        Stop the stand-in peer.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def start_peer() -> Iterator[Callable[..., StandInPeer]]:
+    """
+    Start stand-in peers that are stopped again after the test.
+    """
+    peers: List[StandInPeer] = []
+
+    def start(entries: List[FakeEntry], **kwargs) -> StandInPeer:
+        peer = StandInPeer(entries, **kwargs)
+        peers.append(peer)
+        return peer
+
+    yield start
+
+    for peer in peers:
+        peer.stop()
@@ -0,0 +1,132 @@
+"""
+In-memory stand-in for the Everything SDK DLL.
+"""
+import ntpath
+import fnmatch
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from classes.external.everything import Everything, Sort, FILETIME_EPOCH_OFFSET
+
+
+class FakeEntry:
+    """
+    A file or folder known to the fake Everything index.
+    """
+    def __init__(self, path: str, size: Optional[int] = None,
+                 date_modified: Optional[datetime] = None, is_folder: bool = False):
+        """
+        Initialize a FakeEntry object.
+
+        Args:
+            path: Full path of the file or folder
+            size: Size in bytes, None if unknown
+            date_modified: Date the entry was last modified, None if unknown
+            is_folder: Whether the entry is a folder
+        """
+        self.path = path
+        self.size = size
+        self.date_modified = date_modified
+        self.is_folder = is_folder
+
+
+class FakeEverythingDll:
+    """
+    Implements the Everything_* functions used by the SDK wrapper over a list of entries.
+    """
+    def __init__(self, entries: List[FakeEntry]):
+        """
+        Initialize the FakeEverythingDll.
+
+        Args:
+            entries: The entries of the fake index
+        """
+        self.entries = entries
+        self.results: List[FakeEntry] = []
+        self.search = ""
+        self.sort = Sort.NameAscending
+        self.lock = threading.Lock()
+
+    def Everything_SetSearchW(self, search: str) -> None:
+        self.search = search
+
+    def Everything_SetRequestFlags(self, flags: int) -> None:
+        pass
+
+    def Everything_SetSort(self, sort: int) -> None:
+        self.sort = Sort(sort)
+
+    def Everything_QueryW(self, wait: bool) -> bool:
+        terms = [term.lower() for term in self.search.split()]
+        self.results = [entry for entry in self.entries if all(self._matches(term, entry) for term in terms)]
+
+        descending = self.sort.name.endswith("Descending")
+        field = self.sort.name[:-len("Descending" if descending else "Ascending")]
+        if field == "Path":
+            key = lambda entry: (ntpath.dirname(entry.path).lower(), ntpath.basename(entry.path).lower())
+        elif field == "Size":
+            key = lambda entry: (entry.size is not None, entry.size or 0)
+        elif field == "DateModified":
+            key = lambda entry: (entry.date_modified is not None, entry.date_modified or datetime.min)
+        else:
+            key = lambda entry: (ntpath.basename(entry.path).lower(), ntpath.dirname(entry.path).lower())
+        self.results.sort(key=key, reverse=descending)
+        return True
+
+    @staticmethod
+    def _matches(term: str, entry: FakeEntry) -> bool:
+        """
+        Match a search term like Everything does for the subset of its syntax used in the tests.
+        """
+        path = entry.path.lower()
+        if term.startswith("ext:"):
+            return ntpath.splitext(path)[1] == "." + term[len("ext:"):]
+        if "|" in term:
+            return any(FakeEverythingDll._matches(part, entry) for part in term.split("|") if part)
+        if "*" in term or "?" in term:
+            return fnmatch.fnmatchcase(ntpath.basename(path), term)
+        return term in path
+
+    def Everything_GetNumResults(self) -> int:
+        return len(self.results)
+
+    def Everything_GetLastError(self) -> int:
+        return 0
+
+    def Everything_GetResultFullPathNameW(self, index: int, buffer, size: int) -> int:
+        buffer.value = self.results[index].path
+        return len(buffer.value)
+
+    def Everything_GetResultSize(self, index: int, size) -> bool:
+        if self.results[index].size is None:
+            return False
+        size.value = self.results[index].size
+        return True
+
+    def Everything_GetResultDateModified(self, index: int, filetime) -> bool:
+        date_modified = self.results[index].date_modified
+        if date_modified is None:
+            return False
+        filetime.value = int(date_modified.timestamp() * 10000000) + FILETIME_EPOCH_OFFSET
+        return True
+
+    def Everything_IsFolderResult(self, index: int) -> bool:
+        return self.results[index].is_folder
+
+    def Everything_IsFileResult(self, index: int) -> bool:
+        return not self.results[index].is_folder
+
+
+class FakeEverything(Everything):
+    """
+    Everything SDK wrapper backed by a FakeEverythingDll instead of Everything64.dll.
+    """
+    def __init__(self, entries: List[FakeEntry]):
+        """
+        Initialize the FakeEverything.
+
+        Args:
+            entries: The entries of the fake index
+        """
+        self.dll = FakeEverythingDll(entries)
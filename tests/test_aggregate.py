@@ -0,0 +1,107 @@
+"""
+Tests for the aggregate search over the fake Everything backend.
+"""
+from datetime import datetime
+
+import pytest
+
+from classes.api.server import EverythingAPIServer
+from classes.core.search import SearchService
+from tests.conftest import make_config, make_search_service
+from tests.fake_everything import FakeEntry
+
+ENTRIES = [
+    FakeEntry("D:\\Videos\\Holiday 2024.mkv", 1000, datetime(2024, 7, 14)),
+    FakeEntry("D:\\Videos\\Shows\\Pilot.MKV", 3000, datetime(2025, 2, 3)),
+    FakeEntry("D:\\Videos\\Trailer.avi", 500, datetime(2025, 5, 20)),
+    FakeEntry("D:\\Videos\\Shows", 4000, datetime(2025, 1, 1), is_folder=True),
+    FakeEntry("\\\\nas\\media\\Movies\\Classic.mkv", 2000, None),
+    FakeEntry("C:\\readme", 10, datetime(2023, 3, 3)),
+]
+
+
+@pytest.fixture
+def service() -> SearchService:
+    return make_search_service(ENTRIES)
+
+
+def test_plain_terms_skip_everything_syntax():
+    terms = SearchService._plain_terms(
+        'Holiday ext:mkv *.mkv file?.txt mkv|avi | a<b c>d size:>1gb !tmp "Shows"'
+    )
+
+    assert terms == ["holiday", "shows"]
+
+
+@pytest.mark.parametrize("query", ["ext:mkv", "*.mkv", "mkv|avi"])
+def test_syntax_terms_match_search_results(service, query):
+    aggregated = service.aggregate(query)
+    searched = service.search(query, 100)
+
+    assert aggregated.count > 0
+    assert aggregated.count == searched.count
+
+
+def test_folders_are_counted_but_not_sized(service):
+    response = service.aggregate("videos")
+
+    assert response.count == 4
+    assert response.folder_count == 1
+    assert response.total_size == 4500
+    assert response.min_size == 500
+    assert response.max_size == 3000
+
+
+def test_group_by_extension(service):
+    response = service.aggregate("mkv|avi|readme", group_by="extension")
+
+    groups = {group.key: (group.count, group.total_size) for group in response.groups}
+    assert groups == {".mkv": (3, 6000), ".avi": (1, 500), "": (1, 10)}
+    assert response.groups[0].key == ".mkv"
+
+
+def test_group_by_directory_handles_drives_and_unc_paths(service):
+    response = service.aggregate("mkv|readme", group_by="directory")
+
+    groups = {group.key: group.count for group in response.groups}
+    assert groups == {"D:\\Videos": 2, "\\\\nas\\media\\Movies": 1, "C:\\": 1}
+
+
+def test_histogram_puts_missing_dates_in_unknown_bucket(service):
+    response = service.aggregate("ext:mkv", histogram="year")
+
+    buckets = {bucket.key: (bucket.count, bucket.total_size) for bucket in response.histogram}
+    assert buckets == {"2024": (1, 1000), "2025": (1, 3000), "unknown": (1, 2000)}
+    assert [bucket.key for bucket in response.histogram] == ["2024", "2025", "unknown"]
+
+
+def test_invalid_options_raise(service):
+    with pytest.raises(ValueError):
+        service.aggregate("videos", group_by="size")
+    with pytest.raises(ValueError):
+        service.aggregate("videos", histogram="week")
+
+
+@pytest.mark.parametrize("args, message", [
+    ("group_by=size", "Invalid group_by parameter"),
+    ("histogram=week", "Invalid histogram parameter"),
+])
+def test_aggregate_route_rejects_invalid_options(args, message):
+    client = EverythingAPIServer(make_config(), make_search_service(ENTRIES)).app.test_client()
+
+    response = client.get(f"/everything-search-api/aggregate?q=videos&{args}")
+
+    assert response.status_code == 400
+    assert message in response.get_json()["error"]
+
+
+def test_aggregate_route_returns_totals():
+    client = EverythingAPIServer(make_config(), make_search_service(ENTRIES)).app.test_client()
+
+    response = client.get("/everything-search-api/aggregate?q=*.mkv&group_by=extension")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 3
+    assert data["total_size"] == 6000
+    assert data["groups"] == [{"key": ".mkv", "count": 3, "total_size": 6000}]
@@ -0,0 +1,191 @@
+"""
+Tests for the federated search across stand-in peer instances.
+"""
+import time
+from datetime import datetime
+
+from classes.api.server import EverythingAPIServer
+from classes.core.federation import FederatedSearchService, PeerClient
+from tests.conftest import make_config, make_search_service
+from tests.fake_everything import FakeEntry
+
+NORTH = [
+    FakeEntry("C:\\Reports\\alpha report.pdf", 300, datetime(2025, 1, 5)),
+    FakeEntry("C:\\Reports\\delta report.pdf", 100, datetime(2025, 3, 1)),
+    FakeEntry("C:\\Reports\\golf report.pdf", 700, datetime(2024, 6, 9)),
+]
+SOUTH = [
+    FakeEntry("D:\\a b\\bravo report.pdf", 500, datetime(2025, 2, 2)),
+    FakeEntry("D:\\a\\echo report.pdf", 200, datetime(2023, 11, 30)),
+]
+LOCAL = [
+    FakeEntry("E:\\Shared\\charlie report.pdf", 900, datetime(2025, 4, 4)),
+    FakeEntry("E:\\Shared\\foxtrot report.pdf", 50, datetime(2024, 1, 1)),
+]
+
+
+def test_merges_peers_and_local_in_name_order(start_peer):
+    north = start_peer(NORTH)
+    south = start_peer(SOUTH)
+    service = FederatedSearchService([north.url, south.url], timeout=5, search_service=make_search_service(LOCAL))
+
+    response = service.search("report", 10)
+
+    assert [result.filename for result in response.results] == [
+        "alpha report.pdf", "bravo report.pdf", "charlie report.pdf", "delta report.pdf",
+        "echo report.pdf", "foxtrot report.pdf", "golf report.pdf",
+    ]
+    assert [result.source for result in response.results[:3]] == [north.url, south.url, "local"]
+    assert response.total_count == 7
+    assert not response.partial
+    assert all(peer.ok for peer in response.peers)
+
+
+def test_limit_cuts_merged_stream(start_peer):
+    north = start_peer(NORTH)
+    south = start_peer(SOUTH)
+    service = FederatedSearchService([north.url, south.url], timeout=5, search_service=make_search_service(LOCAL))
+
+    response = service.search("report", 3, sort="size_desc")
+
+    assert [result.size for result in response.results] == [900, 700, 500]
+    assert response.count == 3
+
+
+def test_path_order_follows_parent_folder(start_peer):
+    south = start_peer(SOUTH)
+    service = FederatedSearchService([south.url], timeout=5, search_service=make_search_service(NORTH))
+
+    response = service.search("report", 10, sort="path")
+
+    assert [result.path for result in response.results] == [
+        "C:\\Reports\\alpha report.pdf", "C:\\Reports\\delta report.pdf", "C:\\Reports\\golf report.pdf",
+        "D:\\a\\echo report.pdf", "D:\\a b\\bravo report.pdf",
+    ]
+
+
+def test_date_modified_descending_merge(start_peer):
+    north = start_peer(NORTH)
+    south = start_peer(SOUTH)
+    service = FederatedSearchService([north.url, south.url], timeout=5)
+
+    response = service.search("report", 10, sort="date_modified_desc")
+
+    dates = [result.date_modified for result in response.results]
+    assert dates == sorted(dates, reverse=True)
+    assert len(dates) == 5
+
+
+def test_slow_peer_returns_partial_results(start_peer):
+    north = start_peer(NORTH)
+    slow = start_peer(SOUTH, delay=3.0)
+    service = FederatedSearchService([north.url, slow.url], timeout=1.0)
+
+    response = service.search("report", 10)
+
+    assert response.partial
+    assert [result.source for result in response.results] == [north.url] * 3
+    statuses = {peer.source: peer for peer in response.peers}
+    assert statuses[north.url].ok
+    assert not statuses[slow.url].ok
+    assert "Timed out" in statuses[slow.url].error
+    assert response.to_dict()["partial"] is True
+
+
+def test_peer_http_error_returns_partial_results(start_peer):
+    north = start_peer(NORTH)
+    broken = start_peer(SOUTH, status=500)
+    service = FederatedSearchService([north.url, broken.url], timeout=5)
+
+    response = service.search("report", 10)
+
+    assert response.partial
+    assert response.count == 3
+    status = next(peer for peer in response.peers if peer.source == broken.url)
+    assert not status.ok
+    assert "HTTP 500" in status.error
+    assert "Stand-in failure" in status.error
+
+
+def test_peer_html_error_page_reports_status(start_peer):
+    proxy = start_peer(SOUTH, status=502, error_page=True)
+    service = FederatedSearchService([proxy.url], timeout=5)
+
+    response = service.search("report", 10)
+
+    assert response.partial
+    assert response.peers[0].error == "HTTP 502: unknown error"
+
+
+def test_peer_closing_every_connection_is_reconnected(start_peer):
+    north = start_peer(NORTH)
+    service = FederatedSearchService([north.url], timeout=5)
+
+    for _ in range(3):
+        assert service.search("report", 10).count == 3
+
+    assert north.connections == 3
+
+
+def test_idle_pooled_connection_closed_by_peer_is_replaced(start_peer):
+    north = start_peer(NORTH, idle_timeout=0.1)
+    client = PeerClient(north.url, timeout=5)
+    connection = client._connect()
+    connection.connect()
+    client._release(connection)
+    time.sleep(0.5)
+
+    response = client.search("report", 10, True, "name")
+
+    assert response.count == 3
+    assert north.connections == 2
+
+
+def test_federated_search_route_merges_configured_peers(start_peer):
+    north = start_peer(NORTH)
+    south = start_peer(SOUTH)
+    config = make_config(
+        Federation__peers=f"{north.url}, {south.url}",
+        Federation__timeout="5",
+        Federation__include_local="true",
+        Federation__local_name="office",
+    )
+    client = EverythingAPIServer(config, make_search_service(LOCAL)).app.test_client()
+
+    response = client.get("/everything-search-api/federated-search?q=report&limit=4&sort=name")
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [result["filename"] for result in data["results"]] == [
+        "alpha report.pdf", "bravo report.pdf", "charlie report.pdf", "delta report.pdf",
+    ]
+    assert [result["source"] for result in data["results"]] == [north.url, south.url, "office", north.url]
+    assert data["partial"] is False
+    assert {peer["source"] for peer in data["peers"]} == {"office", north.url, south.url}
+
+
+def test_federated_search_route_honours_timeout_and_excludes_local(start_peer):
+    north = start_peer(NORTH)
+    slow = start_peer(SOUTH, delay=3.0)
+    config = make_config(
+        Federation__peers=f"{north.url},{slow.url}",
+        Federation__timeout="1",
+        Federation__include_local="false",
+    )
+    client = EverythingAPIServer(config, make_search_service(LOCAL)).app.test_client()
+
+    response = client.get("/everything-search-api/federated-search?q=report")
+
+    data = response.get_json()
+    assert data["partial"] is True
+    assert {result["source"] for result in data["results"]} == {north.url}
+    assert [peer["source"] for peer in data["peers"] if not peer["ok"]] == [slow.url]
+    assert "local" not in {peer["source"] for peer in data["peers"]}
+
+
+def test_federated_search_route_requires_peers():
+    client = EverythingAPIServer(make_config(), make_search_service(LOCAL)).app.test_client()
+
+    response = client.get("/everything-search-api/federated-search?q=report")
+
+    assert response.status_code == 404
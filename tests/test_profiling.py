@@ -0,0 +1,123 @@
+"""
+Tests for on-demand request profiling and the admin profile routes.
+"""
+import cProfile
+from datetime import datetime
+
+import pytest
+
+from classes.api.server import EverythingAPIServer
+from classes.utils import profiling
+from classes.utils.profiling import RequestProfiler
+from tests.conftest import make_config, make_search_service
+from tests.fake_everything import FakeEntry
+
+ENTRIES = [
+    FakeEntry("C:\\Reports\\alpha report.pdf", 300, datetime(2025, 1, 5)),
+    FakeEntry("C:\\Reports\\bravo report.pdf", 500, datetime(2025, 2, 2)),
+]
+TOKEN = "s3cret"
+SEARCH_URL = "/everything-search-api/search?q=report"
+PROFILES_URL = "/everything-search-api/admin/profiles"
+
+
+def make_client(**options: str):
+    """
+    Create a test client for an API server with profiling enabled.
+
+    Args:
+        **options: Extra config overrides, see make_config
+
+    Returns:
+        A Flask test client
+    """
+    options = {"Profiling__enabled": "true", "Profiling__admin_token": TOKEN, **options}
+    return EverythingAPIServer(make_config(**options), make_search_service(ENTRIES)).app.test_client()
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "wrong"}])
+def test_profile_request_without_valid_token_is_forbidden(headers):
+    client = make_client()
+
+    response = client.get(f"{SEARCH_URL}&profile=true", headers=headers)
+
+    assert response.status_code == 403
+    assert "X-Profile-Id" not in response.headers
+
+
+@pytest.mark.parametrize("url", [PROFILES_URL, f"{PROFILES_URL}/1"])
+def test_admin_routes_are_forbidden_when_profiling_is_disabled(url):
+    client = make_client(Profiling__enabled="false")
+
+    response = client.get(url, headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 403
+
+
+def test_requested_profile_sets_header_and_stores_report():
+    client = make_client()
+
+    response = client.get(f"{SEARCH_URL}&profile=true", headers={"X-Admin-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert response.get_json()["count"] == 2
+    report_id = response.headers["X-Profile-Id"]
+    report = client.get(f"{PROFILES_URL}/{report_id}", headers={"X-Admin-Token": TOKEN}).get_json()
+    assert report["trigger"] == "requested"
+    assert report["request"].startswith(SEARCH_URL)
+    assert "to_dict" in report["stats"]
+
+
+def test_sample_every_profiles_the_nth_call():
+    client = make_client(Profiling__sample_every="3")
+
+    responses = [client.get(SEARCH_URL) for _ in range(6)]
+
+    assert ["X-Profile-Id" in response.headers for response in responses] == [
+        False, False, True, False, False, True,
+    ]
+    reports = client.get(PROFILES_URL, headers={"X-Admin-Token": TOKEN}).get_json()["reports"]
+    assert [report["trigger"] for report in reports] == ["sampled", "sampled"]
+
+
+def test_ring_buffer_evicts_oldest_report():
+    client = make_client(Profiling__max_reports="2")
+    headers = {"X-Admin-Token": TOKEN}
+
+    ids = [client.get(f"{SEARCH_URL}&profile=true", headers=headers).headers["X-Profile-Id"] for _ in range(3)]
+
+    reports = client.get(PROFILES_URL, headers=headers).get_json()["reports"]
+    assert [str(report["id"]) for report in reports] == [ids[2], ids[1]]
+    assert client.get(f"{PROFILES_URL}/{ids[0]}", headers=headers).status_code == 404
+    assert client.get(f"{PROFILES_URL}/{ids[2]}", headers=headers).status_code == 200
+
+
+def test_failing_profiled_call_releases_lock():
+    profiler = RequestProfiler(enabled=True, admin_token=TOKEN)
+
+    def fail() -> None:
+        raise RuntimeError("search failed")
+
+    with pytest.raises(RuntimeError):
+        profiler.run("/search?q=report", True, fail)
+
+    assert not profiler._profile_lock.locked()
+    result, report = profiler.run("/search?q=report", True, lambda: 42)
+    assert result == 42
+    assert report is not None
+
+
+def test_call_runs_unprofiled_when_another_profiler_is_active(monkeypatch):
+    class ActiveProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs) -> None:
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", ActiveProfile)
+    profiler = RequestProfiler(enabled=True, admin_token=TOKEN)
+
+    result, report = profiler.run("/search?q=report", True, lambda: 42)
+
+    assert result == 42
+    assert report is None
+    assert profiler.get_reports() == []
+    assert not profiler._profile_lock.locked()